@@ -16,7 +16,7 @@ WORKFLOWS:
 - Explore:  pr_comments.py get <owner> <repo> <pr>
 - Single reply: pr_comments.py reply <owner> <repo> <pr> <comment_id> "text"
 - Your comments: pr_comments.py my-comments <owner> <repo> <pr>
-- Batch replies: pr_comments.py reply-batch <json_path> [--dry-run]
+- Batch replies: pr_comments.py reply-batch <json_path> [--dry-run] [--yes] [--concurrency N]
 
 BATCH MODE (reply-batch):
 - Input JSON contains meta (owner/repo/pr), optional policy, and replies[].
@@ -30,13 +30,44 @@ thread level using the same in_reply_to semantics and works for sub-comments.
 import os
 import sys
 import json
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import re
+import asyncio
 import hashlib
 import time
 import subprocess
-import requests
+import httpx
 from datetime import datetime
 
+# HTTP/2 multiplexing needs the optional 'h2' package (httpx[http2]);
+# fall back to HTTP/1.1 silently when it is not installed.
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# orjson parses/serializes nested GitHub payloads 3-10x faster than the
+# stdlib and emits bytes directly; fall back to json when unavailable.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_loads(data):
+    """Parse JSON from bytes or str with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps_compact(obj) -> bytes:
+    """Serialize to compact JSON bytes with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode("utf-8")
+
 # --- REST/GQL endpoints for new batch features ---
 REST = "https://api.github.com"
 GQL = "https://api.github.com/graphql"
@@ -68,6 +99,76 @@ HEADERS = {
     "Accept": "application/vnd.github.v3+json"
 }
 
+# Shared client for the synchronous commands: keep-alive avoids a TLS
+# handshake per call, and with h2 installed all in-flight requests
+# multiplex over a single HTTP/2 connection to api.github.com.
+SESSION = httpx.Client(
+    http2=_HTTP2,
+    headers=HEADERS,
+    timeout=30.0,
+    limits=httpx.Limits(max_connections=20),
+    transport=httpx.HTTPTransport(retries=5),
+)
+
+def _async_client(headers: dict) -> httpx.AsyncClient:
+    """Async client configured like SESSION, for the batch/fetch paths."""
+    return httpx.AsyncClient(
+        http2=_HTTP2,
+        headers=headers,
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=20),
+    )
+
+async def _gh_request(session: httpx.AsyncClient, method: str, url: str, **kw) -> httpx.Response:
+    """Issue a request with header-driven rate-limit pacing.
+
+    Retries 403/429 responses after the server-provided Retry-After (or the
+    X-RateLimit-Reset window), and proactively sleeps until the reset when
+    the remaining budget is nearly exhausted, instead of pausing a fixed
+    100ms between every page.
+    """
+    for attempt in range(3):
+        r = await session.request(method, url, **kw)
+        if r.status_code in (403, 429) and attempt < 2:
+            retry_after = r.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                await asyncio.sleep(int(retry_after) + 1)
+                continue
+            if r.headers.get("X-RateLimit-Remaining") == "0":
+                reset = r.headers.get("X-RateLimit-Reset")
+                if reset and reset.isdigit():
+                    await asyncio.sleep(max(0, int(reset) - time.time()) + 1)
+                    continue
+        remaining = r.headers.get("X-RateLimit-Remaining")
+        reset = r.headers.get("X-RateLimit-Reset")
+        if remaining and remaining.isdigit() and int(remaining) < 10 and reset and reset.isdigit():
+            await asyncio.sleep(max(0, int(reset) - time.time()) + 1)
+        return r
+
+def _gh_request_sync(method: str, url: str, **kw) -> httpx.Response:
+    """Sync counterpart of _gh_request for the SESSION-based commands.
+
+    Same Retry-After/X-RateLimit handling, so reply, my-comments and the
+    author lookups survive 403/429 responses too.
+    """
+    for attempt in range(3):
+        r = SESSION.request(method, url, **kw)
+        if r.status_code in (403, 429) and attempt < 2:
+            retry_after = r.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                time.sleep(int(retry_after) + 1)
+                continue
+            if r.headers.get("X-RateLimit-Remaining") == "0":
+                reset = r.headers.get("X-RateLimit-Reset")
+                if reset and reset.isdigit():
+                    time.sleep(max(0, int(reset) - time.time()) + 1)
+                    continue
+        remaining = r.headers.get("X-RateLimit-Remaining")
+        reset = r.headers.get("X-RateLimit-Reset")
+        if remaining and remaining.isdigit() and int(remaining) < 10 and reset and reset.isdigit():
+            time.sleep(max(0, int(reset) - time.time()) + 1)
+        return r
+
 # New-style headers for REST calls used by batch mode
 def gh_headers():
     tok = TOKEN
@@ -80,65 +181,137 @@ def gh_headers():
     }
 
 # --- hidden idempotency marker helpers ---
-def _marker(fp: str, parent_id: int) -> str:
-    return f"<!-- moliri-reply:{fp}:{parent_id} -->"
+def _marker_prefix(fp: str) -> str:
+    """Batch-constant marker prefix; compute once and append only the parent id."""
+    return f"<!-- moliri-reply:{fp}:"
+
+def _marker(prefix: str, parent_id: int) -> str:
+    """Full idempotency marker from a precomputed _marker_prefix."""
+    return f"{prefix}{parent_id} -->"
+
+_MARKER_RE = re.compile(r"<!-- moliri-reply:[0-9a-f]+:\d+ -->")
+
+class _HashWriter:
+    """File-like adapter that feeds json.dump output straight into a hash."""
+    def __init__(self):
+        self.h = hashlib.sha256()
+
+    def write(self, s: str):
+        self.h.update(s.encode("utf-8"))
+
+def _fingerprint(spec) -> str:
+    """Stable 12-hex-char fingerprint of the batch spec, hashed incrementally.
 
-def _list_review_comments(owner: str, repo: str, pr: int):
+    Deliberately stays on stdlib json: markers already posted to GitHub must
+    keep matching whether or not orjson is installed on a later run.
+    """
+    w = _HashWriter()
+    json.dump(spec, w, sort_keys=True)
+    return w.h.hexdigest()[:12]
+
+async def _list_review_comments(session: httpx.AsyncClient, owner: str, repo: str, pr: int,
+                                newest_first: bool = False):
     """Yield all review comments for a PR (paginated)."""
     url = f"{REST}/repos/{owner}/{repo}/pulls/{pr}/comments?per_page=100"
+    if newest_first:
+        url += "&sort=created&direction=desc"
     while url:
-        r = requests.get(url, headers=gh_headers())
+        r = await _gh_request(session, "GET", url)
         r.raise_for_status()
         for c in r.json():
             yield c
         url = r.links.get("next", {}).get("url")
-        if url:
-            time.sleep(0.1)
-
-def _already_replied(owner: str, repo: str, pr: int, parent_id: int, fp: str) -> bool:
-    m = _marker(fp, parent_id)
-    for c in _list_review_comments(owner, repo, pr):
-        # Check replies in the same thread for the marker
-        if c.get("in_reply_to_id") == parent_id and m in (c.get("body") or ""):
-            return True
-    return False
+
+async def _prefetch_existing_replies(session: httpx.AsyncClient, owner: str, repo: str, pr: int) -> dict[int, set[str]]:
+    """Walk the PR's review comments once, mapping in_reply_to_id -> markers seen in that thread."""
+    existing: dict[int, set[str]] = {}
+    async for c in _list_review_comments(session, owner, repo, pr):
+        parent = c.get("in_reply_to_id")
+        if parent is None:
+            continue
+        markers = _MARKER_RE.findall(c.get("body") or "")
+        if markers:
+            existing.setdefault(parent, set()).update(markers)
+    return existing
+
+async def _already_replied(session: httpx.AsyncClient, owner: str, repo: str, pr: int, parent_id: int, prefix: str) -> bool:
+    # Match the full marker, not just the prefix: GitHub flattens threads, so
+    # a reply targeting sub-comment S carries a marker naming S but comes back
+    # with in_reply_to_id pointing at the thread root — a prefix-only test
+    # would falsely skip other items aimed at the same thread. Newest-first
+    # ordering puts our own recent replies on page one, and an explicit
+    # aclose() stops the generator's pagination the moment a marker is found.
+    m = _marker(prefix, parent_id)
+    gen = _list_review_comments(session, owner, repo, pr, newest_first=True)
+    try:
+        async for c in gen:
+            if c.get("in_reply_to_id") == parent_id and m in (c.get("body") or ""):
+                return True
+        return False
+    finally:
+        await gen.aclose()
 
 def _parse_comment_ref(item) -> int:
     """Return numeric review comment ID from comment_id or from a #discussion_r<ID> URL."""
     if "comment_id" in item and item["comment_id"] is not None:
         return int(item["comment_id"])
-    m = re.search(r"#discussion_r(\d+)$", item.get("comment", ""))
-    if not m:
+    # Cheaper than a regex on this hot path: everything after the last
+    # '#discussion_r' must be the numeric ID.
+    _, sep, tail = item.get("comment", "").rpartition("#discussion_r")
+    if not sep or not tail.isdigit():
         raise ValueError("Provide comment_id or a comment URL ending with #discussion_r<ID>")
-    return int(m.group(1))
+    return int(tail)
 
-def _reply_via_in_reply_to(owner: str, repo: str, pr: int, parent_id: int, body: str):
+async def _reply_via_in_reply_to(session: httpx.AsyncClient, owner: str, repo: str, pr: int, parent_id: int, body: str):
     payload = {"in_reply_to": parent_id, "body": body}
-    r = requests.post(
+    r = await _gh_request(
+        session, "POST",
         f"{REST}/repos/{owner}/{repo}/pulls/{pr}/comments",
-        headers=gh_headers(),
         json=payload,
     )
     r.raise_for_status()
     return r.json()
 
-def _react_to_review_comment(owner: str, repo: str, parent_id: int, emoji: str):
+async def _react_to_review_comment(session: httpx.AsyncClient, owner: str, repo: str, parent_id: int, emoji: str):
     url = f"{REST}/repos/{owner}/{repo}/pulls/comments/{parent_id}/reactions"
-    r = requests.post(url, headers=gh_headers(), json={"content": emoji})
+    r = await _gh_request(session, "POST", url, json={"content": emoji})
     # 200/201 success; 422 means reaction already exists
     if r.status_code not in (200, 201, 422):
         r.raise_for_status()
 
-def _gql(query: str, variables: dict):
+async def _prefetch_reactions(session: httpx.AsyncClient, owner: str, repo: str, parent_ids) -> dict[int, set[str]]:
+    """Fetch the authenticated user's existing reactions per parent, concurrently.
+
+    The listing returns every user's reactions, but reactions are per-user:
+    someone else's matching emoji must not stop ours from being posted, so
+    only the token's own reactions go into the skip set.
+    """
+    me = _current_user_login()
+
+    async def one(pid):
+        r = await _gh_request(
+            session, "GET",
+            f"{REST}/repos/{owner}/{repo}/pulls/comments/{pid}/reactions?per_page=100",
+        )
+        r.raise_for_status()
+        return pid, {
+            x.get("content") for x in r.json()
+            if (x.get("user") or {}).get("login") == me
+        }
+
+    results = await asyncio.gather(*(one(p) for p in parent_ids), return_exceptions=True)
+    return {res[0]: res[1] for res in results if not isinstance(res, BaseException)}
+
+async def _gql(session: httpx.AsyncClient, query: str, variables: dict):
     h = {"Authorization": f"Bearer {TOKEN}"}
-    r = requests.post(GQL, json={"query": query, "variables": variables}, headers=h)
+    r = await _gh_request(session, "POST", GQL, json={"query": query, "variables": variables}, headers=h)
     r.raise_for_status()
     js = r.json()
     if "errors" in js:
         raise RuntimeError(js["errors"])  # bubble up
     return js["data"]
 
-def _get_thread_id_from_comment_node(node_id: str):
+async def _get_thread_id_from_comment_node(session: httpx.AsyncClient, node_id: str):
     q = """
     query($id: ID!) {
       node(id: $id) {
@@ -148,11 +321,41 @@ def _get_thread_id_from_comment_node(node_id: str):
       }
     }
     """
-    data = _gql(q, {"id": node_id})
+    data = await _gql(session, q, {"id": node_id})
     thr = data["node"]["pullRequestReviewThread"]
     return thr["id"], thr["isResolved"]
 
-def _resolve_thread(thread_id: str):
+async def _fetch_thread_map(session: httpx.AsyncClient, owner: str, repo: str, pr: int) -> dict[int, tuple[str, bool]]:
+    """Map review-comment databaseId -> (thread node id, isResolved) for the whole PR in one query."""
+    q = """
+    query($owner: String!, $repo: String!, $pr: Int!, $cursor: String) {
+      repository(owner: $owner, name: $repo) {
+        pullRequest(number: $pr) {
+          reviewThreads(first: 100, after: $cursor) {
+            nodes {
+              id
+              isResolved
+              comments(first: 100) { nodes { databaseId } }
+            }
+            pageInfo { hasNextPage endCursor }
+          }
+        }
+      }
+    }
+    """
+    thread_map: dict[int, tuple[str, bool]] = {}
+    cursor = None
+    while True:
+        data = await _gql(session, q, {"owner": owner, "repo": repo, "pr": pr, "cursor": cursor})
+        threads = data["repository"]["pullRequest"]["reviewThreads"]
+        for t in threads["nodes"]:
+            for c in t["comments"]["nodes"]:
+                thread_map[c["databaseId"]] = (t["id"], t["isResolved"])
+        if not threads["pageInfo"]["hasNextPage"]:
+            return thread_map
+        cursor = threads["pageInfo"]["endCursor"]
+
+async def _resolve_thread(session: httpx.AsyncClient, thread_id: str):
     q = """
     mutation($threadId: ID!) {
       resolveReviewThread(input:{threadId: $threadId}) {
@@ -160,9 +363,10 @@ def _resolve_thread(thread_id: str):
       }
     }
     """
-    _gql(q, {"threadId": thread_id})
+    await _gql(session, q, {"threadId": thread_id})
 
-def reply_batch_from_json(path: str, prefer: str = "auto", dry_run: bool = False) -> None:
+def reply_batch_from_json(path: str, prefer: str = "auto", dry_run: bool = False,
+                          assume_yes: bool = False, concurrency: int = 10) -> None:
     """
     Batch reply to PR review comments using a single JSON “reply package”.
 
@@ -178,8 +382,8 @@ def reply_batch_from_json(path: str, prefer: str = "auto", dry_run: bool = False
       Scans existing thread replies to skip duplicates.
     """
     try:
-        with open(path, "r", encoding="utf-8") as fh:
-            spec = json.load(fh)
+        with open(path, "rb") as fh:
+            spec = _json_loads(fh.read())
     except Exception as e:
         raise SystemExit(f"Failed to read JSON: {e}")
 
@@ -195,171 +399,305 @@ def reply_batch_from_json(path: str, prefer: str = "auto", dry_run: bool = False
         raise SystemExit(f"Invalid JSON spec: {e}")
 
     policy = spec.get("policy", {})
-    fp = hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    fp = _fingerprint(spec)
 
-    # preview
     print(f"Batch replies for {owner}/{repo} PR #{pr} | items: {len(replies)}")
-    try:
-        sample_parent = _parse_comment_ref(replies[0])
-        sample_body = (replies[0].get("body") or "").strip().splitlines()[0:1]
-        sample_body = sample_body[0] if sample_body else ""
-        print(f"Sample: parent {sample_parent} | '{sample_body[:80]}'")
-    except Exception:
-        pass
 
-    if policy.get("confirm", True) and not dry_run:
-        ok = input("Proceed? [y/N] ").strip().lower() == "y"
-        if not ok:
-            print("Aborted.")
-            return
+    had_error = asyncio.run(
+        _run_batch(owner, repo, pr, replies, policy, fp, dry_run, assume_yes, concurrency)
+    )
 
-    had_error = False
+    if had_error and policy.get("fail_on_error"):
+        sys.exit(1)
 
+def _print_plan(replies, policy, prefix, existing) -> None:
+    """Show what each item will actually do (post/skip/react/resolve) before any writes."""
+    print("Plan:")
     for item in replies:
         try:
             parent_id = _parse_comment_ref(item)
         except Exception as e:
-            print(f"REPLY ?: error {e}")
-            had_error = True
-            if policy.get("fail_on_error"):
-                break
+            print(f"  ?: error ({e})")
             continue
+        react = item.get("react") or policy.get("react_default")
+        want_resolve = bool(item.get("resolve") or policy.get("auto_resolve"))
+        if existing is not None and _marker(prefix, parent_id) in existing.get(parent_id, ()):
+            print(f"  {parent_id}: skip (marker)")
+            continue
+        actions = "post"
+        if react:
+            actions += f" + react:{react}"
+        if want_resolve:
+            actions += " + resolve"
+        print(f"  {parent_id}: {actions}")
+
+def _confirm_plan(policy, dry_run: bool, assume_yes: bool) -> bool:
+    """Return True if the batch may proceed, honoring --yes and non-TTY stdin."""
+    if dry_run or assume_yes or not policy.get("confirm", True):
+        return True
+    if not sys.stdin.isatty():
+        raise SystemExit("policy.confirm is set but stdin is not a TTY; rerun with --yes")
+    if input("Proceed? [y/N] ").strip().lower() == "y":
+        return True
+    print("Aborted.")
+    return False
+
+async def _react_item(session, owner, repo, parent_id, react) -> bool:
+    """Post a reaction on the parent comment; return True on error."""
+    try:
+        await _react_to_review_comment(session, owner, repo, parent_id, react)
+        # Cannot distinguish 422 easily without parsing body; treat as ok/exists neutral
+        print(f"REACT {parent_id}: ok")
+        return False
+    except httpx.HTTPStatusError as he:
+        # 422 already reacted
+        if he.response.status_code == 422:
+            print(f"REACT {parent_id}: exists")
+            return False
+        print(f"REACT {parent_id}: error {he}")
+        return True
+    except Exception as e:
+        print(f"REACT {parent_id}: error {e}")
+        return True
+
+async def _resolve_item(session, owner, repo, parent_id, thread_map) -> bool:
+    """Resolve the review thread containing parent_id; return True on error."""
+    try:
+        entry = thread_map.get(parent_id) if thread_map is not None else None
+        if entry is not None:
+            thread_id, is_resolved = entry
+        else:
+            # Fallback for comments missing from the prefetched map (e.g. threads
+            # beyond the first 100 comments): REST node_id lookup + per-node query.
+            pc = await _gh_request(session, "GET", f"{REST}/repos/{owner}/{repo}/pulls/comments/{parent_id}")
+            pc.raise_for_status()
+            node_id = pc.json()["node_id"]
+            thread_id, is_resolved = await _get_thread_id_from_comment_node(session, node_id)
+        if not is_resolved:
+            await _resolve_thread(session, thread_id)
+            print(f"RESOLVE thread {thread_id}: ok")
+        else:
+            print(f"RESOLVE thread {thread_id}: already")
+        return False
+    except Exception as e:
+        print(f"RESOLVE {parent_id}: error {e}")
+        return True
 
-        body = (item.get("body") or "").rstrip() + "\n\n" + _marker(fp, parent_id)
+async def _process_batch_item(session, sem, owner, repo, pr, item, policy, prefix, existing, reactions, resolve_queue, dry_run) -> bool:
+    """Handle one batch reply (marker scan, post, react, resolve); return True on error."""
+    async with sem:
+        try:
+            parent_id = _parse_comment_ref(item)
+        except Exception as e:
+            print(f"REPLY ?: error {e}")
+            return True
+
+        m = _marker(prefix, parent_id)
+        body = (item.get("body") or "").rstrip() + "\n\n" + m
         react = item.get("react") or policy.get("react_default")
         want_resolve = bool(item.get("resolve") or policy.get("auto_resolve"))
 
-        # idempotency marker scan
+        # idempotency marker check against the prefetched cache (per-item scan as fallback)
         try:
-            if _already_replied(owner, repo, pr, parent_id, fp):
+            if existing is not None:
+                replied = m in existing.get(parent_id, ())
+            else:
+                replied = await _already_replied(session, owner, repo, pr, parent_id, prefix)
+            if replied:
                 print(f"REPLY {parent_id}: skipped (marker)")
                 # still react/resolve? spec implies actions apply after reply; skip both to be safe
-                continue
+                return False
         except Exception as e:
             print(f"REPLY {parent_id}: error during marker scan: {e}")
-            had_error = True
-            if policy.get("fail_on_error"):
-                break
-            continue
+            return True
 
         # post reply
+        had_error = False
         if dry_run:
             print(f"REPLY {parent_id}: DRY RUN")
         else:
             try:
                 # Preserve current semantics: in_reply_to works for sub-comments
-                reply_json = _reply_via_in_reply_to(owner, repo, pr, parent_id, body)
+                reply_json = await _reply_via_in_reply_to(session, owner, repo, pr, parent_id, body)
                 new_id = reply_json.get("id")
                 print(f"REPLY {parent_id}: ok {new_id}")
+                if existing is not None:
+                    # later items in this batch should see the fresh marker without
+                    # refetching; no lock needed — all tasks share one event-loop
+                    # thread and this mutation has no await point inside it
+                    existing.setdefault(parent_id, set()).add(m)
             except Exception as e:
                 print(f"REPLY {parent_id}: error {e}")
                 had_error = True
-                if policy.get("fail_on_error"):
-                    break
 
-        # reactions (apply to parent comment)
+        # reactions fire immediately after the reply; resolves are only queued
+        # here and run as one aliased mutation once all replies are posted
+        side_effects = []
         if react:
             if dry_run:
                 print(f"REACT {parent_id}: DRY RUN ({react})")
+            elif react in reactions.get(parent_id, ()):
+                # the emoji is already on the parent; a POST would only earn a 422
+                print(f"REACT {parent_id}: exists")
             else:
-                try:
-                    _react_to_review_comment(owner, repo, parent_id, react)
-                    # Cannot distinguish 422 easily without parsing body; treat as ok/exists neutral
-                    print(f"REACT {parent_id}: ok")
-                except requests.HTTPError as he:
-                    # 422 already reacted
-                    if he.response is not None and he.response.status_code == 422:
-                        print(f"REACT {parent_id}: exists")
-                    else:
-                        print(f"REACT {parent_id}: error {he}")
-                        had_error = True
-                        if policy.get("fail_on_error"):
-                            break
-                except Exception as e:
-                    print(f"REACT {parent_id}: error {e}")
-                    had_error = True
-                    if policy.get("fail_on_error"):
-                        break
-
-        # resolve thread (GraphQL)
+                side_effects.append(_react_item(session, owner, repo, parent_id, react))
         if want_resolve:
             if dry_run:
                 print(f"RESOLVE {parent_id}: DRY RUN")
             else:
-                try:
-                    pc = requests.get(
-                        f"{REST}/repos/{owner}/{repo}/pulls/comments/{parent_id}",
-                        headers=gh_headers(),
-                    )
-                    pc.raise_for_status()
-                    node_id = pc.json()["node_id"]
-                    thread_id, is_resolved = _get_thread_id_from_comment_node(node_id)
-                    if not is_resolved:
-                        _resolve_thread(thread_id)
-                        print(f"RESOLVE thread {thread_id}: ok")
-                    else:
-                        print(f"RESOLVE thread {thread_id}: already")
-                except Exception as e:
-                    print(f"RESOLVE {parent_id}: error {e}")
-                    had_error = True
-                    if policy.get("fail_on_error"):
-                        break
+                # resolves are deferred and batched into aliased mutations
+                resolve_queue.append(parent_id)
+        if side_effects:
+            results = await asyncio.gather(*side_effects)
+            had_error = had_error or any(results)
 
-    if had_error and policy.get("fail_on_error"):
-        sys.exit(1)
+        return had_error
 
-def get_pr_comments(owner, repo, pr_number):
-    """
-    Get all comments from a PR (both issue comments and review comments)
-    
-    FOR AI AGENTS:
-    - Returns structured JSON saved to: pr_{owner}_{repo}_{pr_number}_comments.json
-    - Issue comments: Have unique IDs like 98765 for replies
-    - Review comments: Organized in threads with root and sub-comments
-    - Outdated comments: Marked with "outdated": true (from old code versions)
-    - Use comment IDs from output to reply to specific comments
+async def _resolve_batch(session, owner, repo, resolve_queue, thread_map) -> bool:
+    """Resolve all queued threads, aliasing up to 25 mutations per request.
+
+    One GraphQL document like `mutation($t0: ID!, ...) { a0: resolveReviewThread(...)
+    ... }` replaces N mutation round-trips and spends one unit of rate-limit
+    budget instead of N.
     """
+    had_error = False
+    thread_ids = []
+    seen = set()
+    for parent_id in resolve_queue:
+        entry = thread_map.get(parent_id) if thread_map is not None else None
+        if entry is None:
+            # not in the prefetched map: fall back to the per-item lookup+mutation
+            had_error = await _resolve_item(session, owner, repo, parent_id, thread_map) or had_error
+            continue
+        thread_id, is_resolved = entry
+        if is_resolved:
+            print(f"RESOLVE thread {thread_id}: already")
+        elif thread_id not in seen:
+            seen.add(thread_id)
+            thread_ids.append(thread_id)
+
+    for i in range(0, len(thread_ids), 25):
+        chunk = thread_ids[i:i + 25]
+        sig = ", ".join(f"$t{j}: ID!" for j in range(len(chunk)))
+        fields = " ".join(
+            f"a{j}: resolveReviewThread(input: {{threadId: $t{j}}}) {{ thread {{ id isResolved }} }}"
+            for j in range(len(chunk))
+        )
+        try:
+            await _gql(session, f"mutation({sig}) {{ {fields} }}",
+                       {f"t{j}": tid for j, tid in enumerate(chunk)})
+            for tid in chunk:
+                print(f"RESOLVE thread {tid}: ok")
+        except Exception as e:
+            print(f"RESOLVE batch: error {e}")
+            had_error = True
+    return had_error
+
+async def _run_batch(owner, repo, pr, replies, policy, fp, dry_run, assume_yes, concurrency) -> bool:
+    """Dispatch all batch items concurrently with a bounded semaphore."""
+    sem = asyncio.Semaphore(concurrency)
+    prefix = _marker_prefix(fp)
+    async with _async_client(gh_headers()) as session:
+        try:
+            existing = await _prefetch_existing_replies(session, owner, repo, pr)
+        except Exception as e:
+            print(f"WARN: prefetch of existing replies failed ({e}); falling back to per-item scans")
+            existing = None
+        _print_plan(replies, policy, prefix, existing)
+        if not _confirm_plan(policy, dry_run, assume_yes):
+            return False
+        thread_map = None
+        if not dry_run and any(item.get("resolve") or policy.get("auto_resolve") for item in replies):
+            try:
+                thread_map = await _fetch_thread_map(session, owner, repo, pr)
+            except Exception as e:
+                print(f"WARN: review-thread prefetch failed ({e}); falling back to per-item lookups")
+        reactions = {}
+        if not dry_run:
+            # Only parents that will actually get a reaction; marker-skipped
+            # items never reach the react step anyway
+            react_parents = set()
+            for item in replies:
+                if not (item.get("react") or policy.get("react_default")):
+                    continue
+                try:
+                    pid = _parse_comment_ref(item)
+                except Exception:
+                    continue
+                if existing is not None and _marker(prefix, pid) in existing.get(pid, ()):
+                    continue
+                react_parents.add(pid)
+            if react_parents:
+                reactions = await _prefetch_reactions(session, owner, repo, react_parents)
+        resolve_queue = []
+
+        def _item_task(item):
+            return _process_batch_item(session, sem, owner, repo, pr, item, policy,
+                                       prefix, existing, reactions, resolve_queue, dry_run)
+
+        # Items sharing a parent share a marker; run them sequentially within
+        # one task so the second's cache check runs after the first's post and
+        # cache update, not concurrently past both (check-then-act race).
+        grouped: dict[int, list] = {}
+        unparsed = []
+        for item in replies:
+            try:
+                grouped.setdefault(_parse_comment_ref(item), []).append(item)
+            except Exception:
+                unparsed.append(item)  # reported as an error inside the item task
+
+        async def _run_group(items):
+            err = False
+            for it in items:
+                err = await _item_task(it) or err
+            return err
+
+        tasks = [_run_group(items) for items in grouped.values()]
+        tasks += [_item_task(item) for item in unparsed]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        had_error = any(r is True or isinstance(r, BaseException) for r in results)
+        if resolve_queue:
+            had_error = await _resolve_batch(session, owner, repo, resolve_queue, thread_map) or had_error
+    return had_error
+
+def _fetch_pr_comments_rest(owner, repo, pr_number):
+    """Fetch and structure PR comments via the REST API (fallback for --rest)."""
     base_url = "https://api.github.com"
-    
-    print(f"\n📋 Fetching comments for {owner}/{repo} PR #{pr_number}\n")
-    
-    # Get PR details first to understand state
-    pr_url = f"{base_url}/repos/{owner}/{repo}/pulls/{pr_number}"
-    pr_response = requests.get(pr_url, headers=HEADERS)
-    pr_response.raise_for_status()
-    pr_data = pr_response.json()
-    
+
+    async def _fetch_json(session, url):
+        r = await _gh_request(session, "GET", url)
+        r.raise_for_status()
+        return r.json()
+
+    async def _fetch_all_pages(session, url):
+        """Collect every page of a paginated listing; next page starts while current parses."""
+        items = []
+        resp = await _gh_request(session, "GET", url)
+        while True:
+            resp.raise_for_status()
+            nxt = resp.links.get("next", {}).get("url")
+            # Kick off page N+1 before decoding page N so the fetches overlap
+            next_task = asyncio.ensure_future(_gh_request(session, "GET", nxt)) if nxt else None
+            items.extend(resp.json())
+            if next_task is None:
+                return items
+            resp = await next_task
+
+    async def _fetch():
+        async with _async_client(HEADERS) as session:
+            # PR detail, both comment listings and reviews are independent: fetch concurrently
+            return await asyncio.gather(
+                _fetch_json(session, f"{base_url}/repos/{owner}/{repo}/pulls/{pr_number}"),
+                _fetch_all_pages(session, f"{base_url}/repos/{owner}/{repo}/issues/{pr_number}/comments?per_page=100"),
+                _fetch_all_pages(session, f"{base_url}/repos/{owner}/{repo}/pulls/{pr_number}/comments?per_page=100"),
+                _fetch_json(session, f"{base_url}/repos/{owner}/{repo}/pulls/{pr_number}/reviews"),
+            )
+
+    pr_data, issue_comments, review_comments, reviews = asyncio.run(_fetch())
+
     is_merged = pr_data.get('merged', False)
     is_closed = pr_data.get('state') == 'closed'
-    
-    # Get issue comments (general discussion) with pagination
-    issue_comments = []
-    issue_url = f"{base_url}/repos/{owner}/{repo}/issues/{pr_number}/comments?per_page=100"
-    while issue_url:
-        issue_response = requests.get(issue_url, headers=HEADERS)
-        issue_response.raise_for_status()
-        issue_comments.extend(issue_response.json())
-        issue_url = issue_response.links.get("next", {}).get("url")
-        if issue_url:
-            time.sleep(0.1)
-    
-    # Get review comments (code-specific) with pagination
-    review_comments = []
-    review_url = f"{base_url}/repos/{owner}/{repo}/pulls/{pr_number}/comments?per_page=100"
-    while review_url:
-        review_response = requests.get(review_url, headers=HEADERS)
-        review_response.raise_for_status()
-        review_comments.extend(review_response.json())
-        review_url = review_response.links.get("next", {}).get("url")
-        if review_url:
-            time.sleep(0.1)
-    
-    # Get review threads to check if resolved
-    reviews_url = f"{base_url}/repos/{owner}/{repo}/pulls/{pr_number}/reviews"
-    reviews_response = requests.get(reviews_url, headers=HEADERS)
-    reviews_response.raise_for_status()
-    reviews = reviews_response.json()
-    
+
     # Structure the output
     output = {
         "pr": {
@@ -415,48 +753,196 @@ def get_pr_comments(owner, repo, pr_number):
         })
     
     output["review_comments"] = list(review_threads.values())
-    
+    return output
+
+def _fetch_pr_comments_graphql(owner, repo, pr_number):
+    """Fetch and structure PR comments with a single GraphQL query.
+
+    One round-trip retrieves PR metadata, issue comments and review threads
+    (with resolution state, which REST does not expose); extra requests are
+    only made when a connection spans more than one page.
+    """
+    q = """
+    query($owner: String!, $repo: String!, $pr: Int!, $commentsCursor: String, $threadsCursor: String) {
+      repository(owner: $owner, name: $repo) {
+        pullRequest(number: $pr) {
+          state
+          merged
+          title
+          comments(first: 100, after: $commentsCursor) {
+            nodes { databaseId author { login } body createdAt url }
+            pageInfo { hasNextPage endCursor }
+          }
+          reviewThreads(first: 50, after: $threadsCursor) {
+            nodes {
+              isResolved
+              isOutdated
+              path
+              line
+              comments(first: 100) {
+                nodes { databaseId author { login } body createdAt url replyTo { databaseId } }
+              }
+            }
+            pageInfo { hasNextPage endCursor }
+          }
+        }
+      }
+    }
+    """
+
+    async def _fetch():
+        issue_nodes, thread_nodes = [], []
+        comments_cursor = threads_cursor = None
+        comments_done = threads_done = False
+        async with _async_client(HEADERS) as session:
+            while True:
+                data = await _gql(session, q, {
+                    "owner": owner, "repo": repo, "pr": pr_number,
+                    "commentsCursor": comments_cursor, "threadsCursor": threads_cursor,
+                })
+                pr_node = data["repository"]["pullRequest"]
+                conn = pr_node["comments"]
+                if not comments_done:
+                    issue_nodes.extend(conn["nodes"])
+                    comments_done = not conn["pageInfo"]["hasNextPage"]
+                    comments_cursor = conn["pageInfo"]["endCursor"]
+                conn = pr_node["reviewThreads"]
+                if not threads_done:
+                    thread_nodes.extend(conn["nodes"])
+                    threads_done = not conn["pageInfo"]["hasNextPage"]
+                    threads_cursor = conn["pageInfo"]["endCursor"]
+                if comments_done and threads_done:
+                    return pr_node, issue_nodes, thread_nodes
+
+    pr_node, issue_nodes, thread_nodes = asyncio.run(_fetch())
+
+    # Shape the nodes exactly like the REST path so callers are unchanged
+    is_merged = bool(pr_node["merged"])
+    state = "closed" if pr_node["state"] in ("CLOSED", "MERGED") else "open"
+
+    issue_comments = [{
+        "id": c["databaseId"],
+        "author": (c["author"] or {}).get("login") or "ghost",
+        "body": c["body"],
+        "created_at": c["createdAt"],
+        "html_url": c["url"],
+        "type": "issue_comment"
+    } for c in issue_nodes]
+
+    review_threads = []
+    total_review_comments = 0
+    for t in thread_nodes:
+        comments = t["comments"]["nodes"]
+        if not comments:
+            continue
+        total_review_comments += len(comments)
+        review_threads.append({
+            "id": comments[0]["databaseId"],
+            "path": t["path"],
+            "line": t["line"],
+            "resolved": t["isResolved"],
+            "outdated": t["isOutdated"],
+            "comments": [{
+                "id": c["databaseId"],
+                "author": (c["author"] or {}).get("login") or "ghost",
+                "body": c["body"],
+                "created_at": c["createdAt"],
+                "html_url": c["url"],
+                "in_reply_to": (c["replyTo"] or {}).get("databaseId")
+            } for c in comments]
+        })
+
+    return {
+        "pr": {
+            "owner": owner,
+            "repo": repo,
+            "number": pr_number,
+            "state": state,
+            "merged": is_merged,
+            "title": pr_node["title"]
+        },
+        "summary": {
+            "total_issue_comments": len(issue_comments),
+            "total_review_comments": total_review_comments,
+            "total_all": len(issue_comments) + total_review_comments
+        },
+        "issue_comments": issue_comments,
+        "review_comments": review_threads
+    }
+
+def _preview(body: str, limit: int) -> str:
+    """One-line preview of a comment body, truncated with an ellipsis.
+
+    Only runs replace() when the slice actually contains a newline.
+    """
+    p = body[:limit]
+    if '\n' in p:
+        p = p.replace('\n', ' ')
+    if len(body) > limit:
+        p += "..."
+    return p
+
+def _fetch_pr_comments(owner, repo, pr_number, use_rest=False):
+    """Fetch the structured comments dict with no printing or file writes."""
+    if use_rest:
+        return _fetch_pr_comments_rest(owner, repo, pr_number)
+    return _fetch_pr_comments_graphql(owner, repo, pr_number)
+
+def get_pr_comments(owner, repo, pr_number, use_rest=False):
+    """
+    Get all comments from a PR (both issue comments and review comments)
+
+    FOR AI AGENTS:
+    - Returns structured JSON saved to: pr_{owner}_{repo}_{pr_number}_comments.json
+    - Issue comments: Have unique IDs like 98765 for replies
+    - Review comments: Organized in threads with root and sub-comments
+    - Outdated comments: Marked with "outdated": true (from old code versions)
+    - Use comment IDs from output to reply to specific comments
+    - Default fetch is one GraphQL round-trip; pass --rest for the old REST path
+    """
+    print(f"\n📋 Fetching comments for {owner}/{repo} PR #{pr_number}\n")
+
+    output = _fetch_pr_comments(owner, repo, pr_number, use_rest=use_rest)
+
+    pr_info = output["pr"]
+
     # Print summary with AI agent instructions
     print("=" * 60)
-    print(f"PR #{pr_number}: {pr_data['title']}")
-    print(f"State: {pr_data['state']} {'(merged)' if is_merged else ''}")
+    print(f"PR #{pr_number}: {pr_info['title']}")
+    print(f"State: {pr_info['state']} {'(merged)' if pr_info['merged'] else ''}")
     print("=" * 60)
-    
-    print(f"\n📝 Issue Comments: {len(issue_comments)} (use IDs below for replies)")
+
+    print(f"\n📝 Issue Comments: {output['summary']['total_issue_comments']} (use IDs below for replies)")
     for comment in output["issue_comments"]:
-        preview = comment['body'][:80].replace('\n', ' ')
-        if len(comment['body']) > 80:
-            preview += "..."
-        print(f"  [{comment['id']}] @{comment['author']}: {preview}")
+        print(f"  [{comment['id']}] @{comment['author']}: {_preview(comment['body'], 80)}")
     
-    print(f"\n💻 Review Comments: {len(review_threads)} threads")
+    print(f"\n💻 Review Comments: {len(output['review_comments'])} threads")
     print("  Note: All replies appear at same level (no deep nesting)")
     for thread in output["review_comments"]:
         status = "❌ OUTDATED" if thread['outdated'] else "✅ ACTIVE"
         print(f"  Thread on {thread['path']} {status}")
         
-        # Sort comments to show thread structure
+        # Sort comments to show thread structure; bucket replies by parent
+        # once so each root does an O(1) lookup instead of rescanning
         root_comments = [c for c in thread['comments'] if not c['in_reply_to']]
-        sub_comments = [c for c in thread['comments'] if c['in_reply_to']]
-        
+        subs_by_parent = defaultdict(list)
+        for c in thread['comments']:
+            if c['in_reply_to']:
+                subs_by_parent[c['in_reply_to']].append(c)
+
         for comment in root_comments:
-            preview = comment['body'][:60].replace('\n', ' ')
-            if len(comment['body']) > 60:
-                preview += "..."
-            print(f"    • [{comment['id']}] @{comment['author']}: {preview}")
-            
+            print(f"    • [{comment['id']}] @{comment['author']}: {_preview(comment['body'], 60)}")
+
             # Show sub-comments under their parent
-            for sub in sub_comments:
-                if sub['in_reply_to'] == comment['id']:
-                    sub_preview = sub['body'][:60].replace('\n', ' ')
-                    if len(sub['body']) > 60:
-                        sub_preview += "..."
-                    print(f"      └─ [{sub['id']}] @{sub['author']}: {sub_preview}")
+            for sub in subs_by_parent.get(comment['id'], ()):
+                print(f"      └─ [{sub['id']}] @{sub['author']}: {_preview(sub['body'], 60)}")
     
     # Save to file for reference
     output_file = f"pr_{owner}_{repo}_{pr_number}_comments.json"
-    with open(output_file, 'w') as f:
-        json.dump(output, f, indent=2)
+    with open(output_file, 'wb') as f:
+        # Compact output: ~30% smaller files and less serialization CPU
+        # than indent=2; consumers are programs, not people.
+        f.write(_json_dumps_compact(output))
     
     print(f"\n💾 Full data saved to: {output_file}")
     print(f"📋 AI AGENTS: Parse the JSON file to process comments programmatically")
@@ -484,13 +970,19 @@ def reply_to_comment(owner, repo, pr_number, comment_id, reply_text, comment_typ
     
     print(f"\n💬 Replying to comment {comment_id} in {owner}/{repo} PR #{pr_number}")
     
-    # If auto-detect, try to figure out comment type
+    # If auto-detect, probe both endpoints at once: whichever answers 200
+    # wins, and the winning response doubles as the context fetch below
+    issue_resp = review_resp = None
     if comment_type == "auto":
-        # Try issue comment first
-        check_url = f"{base_url}/repos/{owner}/{repo}/issues/comments/{comment_id}"
-        response = requests.get(check_url, headers=HEADERS)
-        
-        if response.status_code == 200:
+        issue_url = f"{base_url}/repos/{owner}/{repo}/issues/comments/{comment_id}"
+        review_url = f"{base_url}/repos/{owner}/{repo}/pulls/comments/{comment_id}"
+        with ThreadPoolExecutor(2) as ex:
+            f_issue = ex.submit(_gh_request_sync, "GET", issue_url)
+            f_review = ex.submit(_gh_request_sync, "GET", review_url)
+            issue_resp = f_issue.result()
+            review_resp = f_review.result()
+
+        if issue_resp.status_code == 200:
             comment_type = "issue"
             print("   Type: Issue comment")
         else:
@@ -503,9 +995,12 @@ def reply_to_comment(owner, repo, pr_number, comment_id, reply_text, comment_typ
             # We'll mention the author and quote part of their comment for context
             author = get_comment_author(owner, repo, comment_id, 'issue')
             
-            # Get original comment for context
-            comment_url = f"{base_url}/repos/{owner}/{repo}/issues/comments/{comment_id}"
-            comment_response = requests.get(comment_url, headers=HEADERS)
+            # Get original comment for context (reuse the probe response if we have it)
+            if issue_resp is not None:
+                comment_response = issue_resp
+            else:
+                comment_url = f"{base_url}/repos/{owner}/{repo}/issues/comments/{comment_id}"
+                comment_response = _gh_request_sync("GET", comment_url)
             
             if comment_response.status_code == 200:
                 original = comment_response.json()
@@ -519,12 +1014,15 @@ def reply_to_comment(owner, repo, pr_number, comment_id, reply_text, comment_typ
                 body = f"@{author} {reply_text}"
             
             url = f"{base_url}/repos/{owner}/{repo}/issues/{pr_number}/comments"
-            response = requests.post(url, headers=HEADERS, json={"body": body})
+            response = _gh_request_sync("POST", url, json={"body": body})
             
         else:  # review comment
             # First, check if this comment already has a parent (is it already a sub-comment?)
-            comment_url = f"{base_url}/repos/{owner}/{repo}/pulls/comments/{comment_id}"
-            comment_response = requests.get(comment_url, headers=HEADERS)
+            if review_resp is not None:
+                comment_response = review_resp
+            else:
+                comment_url = f"{base_url}/repos/{owner}/{repo}/pulls/comments/{comment_id}"
+                comment_response = _gh_request_sync("GET", comment_url)
             
             if comment_response.status_code == 200:
                 original = comment_response.json()
@@ -541,7 +1039,7 @@ def reply_to_comment(owner, repo, pr_number, comment_id, reply_text, comment_typ
                         "body": f"@{original['user']['login']} {reply_text}",
                         "in_reply_to": comment_id  # Can use the sub-comment ID
                     }
-                    response = requests.post(url, headers=HEADERS, json=payload)
+                    response = _gh_request_sync("POST", url, json=payload)
                 else:
                     # This is a root comment, we can reply to it
                     print(f"   Note: Replying to thread root comment")
@@ -552,7 +1050,7 @@ def reply_to_comment(owner, repo, pr_number, comment_id, reply_text, comment_typ
                         "body": reply_text,
                         "in_reply_to": comment_id
                     }
-                    response = requests.post(url, headers=HEADERS, json=payload)
+                    response = _gh_request_sync("POST", url, json=payload)
             else:
                 print(f"❌ Could not fetch original comment details")
                 return False
@@ -572,6 +1070,31 @@ def reply_to_comment(owner, repo, pr_number, comment_id, reply_text, comment_typ
         print(f"❌ Error posting reply: {str(e)}")
         return False
 
+def _current_user_login() -> str:
+    """Login of the token's user, cached on disk to skip the /user round-trip.
+
+    The cache file is keyed by a hash of the token (never the token itself)
+    and expires after 30 days.
+    """
+    key = hashlib.sha256(TOKEN.encode("utf-8")).hexdigest()[:16]
+    cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "pr_comments")
+    cache_path = os.path.join(cache_dir, f"{key}.json")
+    try:
+        if time.time() - os.path.getmtime(cache_path) < 30 * 24 * 3600:
+            with open(cache_path, "rb") as fh:
+                login = _json_loads(fh.read()).get("login")
+            if login:
+                return login
+    except (OSError, ValueError):
+        pass
+    r = _gh_request_sync("GET", f"{REST}/user")
+    r.raise_for_status()
+    login = r.json()['login']
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, "wb") as fh:
+        fh.write(_json_dumps_compact({"login": login}))
+    return login
+
 def get_comment_author(owner, repo, comment_id, comment_type):
     """Helper to get comment author for mentions"""
     base_url = "https://api.github.com"
@@ -581,7 +1104,7 @@ def get_comment_author(owner, repo, comment_id, comment_type):
     else:
         url = f"{base_url}/repos/{owner}/{repo}/pulls/comments/{comment_id}"
     
-    response = requests.get(url, headers=HEADERS)
+    response = _gh_request_sync("GET", url)
     if response.status_code == 200:
         return response.json()['user']['login']
     return ""
@@ -595,17 +1118,12 @@ def list_my_pr_comments(owner, repo, pr_number):
     - Shows all your previous comments with their IDs
     - Helps track which comments you've already responded to
     """
-    base_url = "https://api.github.com"
-    
-    # Get current user
-    user_response = requests.get(f"{base_url}/user", headers=HEADERS)
-    user_response.raise_for_status()
-    my_username = user_response.json()['login']
+    my_username = _current_user_login()
     
     print(f"\n👤 Finding comments by @{my_username} in {owner}/{repo} PR #{pr_number}\n")
-    
-    # Get all comments
-    all_comments = get_pr_comments(owner, repo, pr_number)
+
+    # Fetch without the 'get' command's side effects (JSON file, full summary)
+    all_comments = _fetch_pr_comments(owner, repo, pr_number)
     
     my_comments = []
     
@@ -613,18 +1131,28 @@ def list_my_pr_comments(owner, repo, pr_number):
     for comment in all_comments['issue_comments']:
         if comment['author'] == my_username:
             my_comments.append(comment)
-            print(f"Issue comment [{comment['id']}]: {comment['body'][:100]}...")
+            print(f"Issue comment [{comment['id']}]: {_preview(comment['body'], 100)}")
     
     # Filter review comments
     for thread in all_comments['review_comments']:
         for comment in thread['comments']:
             if comment['author'] == my_username:
                 my_comments.append(comment)
-                print(f"Review comment [{comment['id']}]: {comment['body'][:100]}...")
+                print(f"Review comment [{comment['id']}]: {_preview(comment['body'], 100)}")
     
     print(f"\n📊 Total: {len(my_comments)} comments by you")
     return my_comments
 
+def _positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1, got {n}")
+    return n
+
 def main():
     """
     Simple CLI interface for AI agent interaction
@@ -653,9 +1181,10 @@ SETUP:
   export GITHUB_TOKEN=your_github_token
 
 USAGE:
-  pr_comments.py get <owner> <repo> <pr_number>
+  pr_comments.py get <owner> <repo> <pr_number> [--rest]
     Get all comments from a PR and save to JSON file
     Output shows comment IDs needed for replies
+    Uses one GraphQL round-trip; --rest falls back to the REST API
     
   pr_comments.py reply <owner> <repo> <pr_number> <comment_id> "reply text"
     Reply to a specific comment using its ID
@@ -664,10 +1193,11 @@ USAGE:
   pr_comments.py my-comments <owner> <repo> <pr_number>
     List all your previous comments to avoid duplicates
 
-  pr_comments.py reply-batch <json_path> [--dry-run]
+  pr_comments.py reply-batch <json_path> [--dry-run] [--yes] [--concurrency N]
     Post many replies from one JSON package with idempotency, optional
     reactions, and optional thread resolution via GraphQL. If the JSON
-    has policy.confirm=true, you'll get a single approval prompt.
+    has policy.confirm=true, you'll see the full plan and get a single
+    approval prompt; pass --yes (or -y) to skip it in CI/daemon runs.
 
 EXAMPLES:
   pr_comments.py get microsoft vscode 12345
@@ -703,14 +1233,14 @@ JSON CONTRACT (reply-batch brief):
     
     if command == "get":
         if len(sys.argv) < 5:
-            print("Usage: pr_comments.py get <owner> <repo> <pr_number>")
+            print("Usage: pr_comments.py get <owner> <repo> <pr_number> [--rest]")
             sys.exit(1)
-        
+
         owner = sys.argv[2]
         repo = sys.argv[3]
         pr_number = int(sys.argv[4])
-        
-        get_pr_comments(owner, repo, pr_number)
+
+        get_pr_comments(owner, repo, pr_number, use_rest="--rest" in sys.argv[5:])
     
     elif command == "reply":
         if len(sys.argv) < 7:
@@ -737,12 +1267,16 @@ JSON CONTRACT (reply-batch brief):
         list_my_pr_comments(owner, repo, pr_number)
     
     elif command == "reply-batch":
-        if len(sys.argv) < 3:
-            print("Usage: pr_comments.py reply-batch <json_path> [--dry-run]")
-            sys.exit(1)
-        json_path = sys.argv[2]
-        dry = "--dry-run" in sys.argv[3:]
-        reply_batch_from_json(json_path, prefer="auto", dry_run=dry)
+        parser = argparse.ArgumentParser(prog="pr_comments.py reply-batch")
+        parser.add_argument("json_path", help="path to the JSON reply package")
+        parser.add_argument("--dry-run", action="store_true", help="show actions without posting")
+        parser.add_argument("-y", "--yes", action="store_true",
+                            help="skip the confirmation prompt (required for non-TTY runs)")
+        parser.add_argument("--concurrency", type=_positive_int, default=10, metavar="N",
+                            help="max in-flight items, at least 1 (default: 10)")
+        args = parser.parse_args(sys.argv[2:])
+        reply_batch_from_json(args.json_path, prefer="auto", dry_run=args.dry_run,
+                              assume_yes=args.yes, concurrency=args.concurrency)
     
     else:
         print(f"Unknown command: {command}")